@@ -27,8 +27,8 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 if PROJECT_ROOT not in sys.path:
      sys.path.insert(0, PROJECT_ROOT)
 
-logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 logger = logging.getLogger("QueryEngine")
+logger.addHandler(logging.NullHandler())
 
 
 # -------------------- Custom Backend Embedding --------------------
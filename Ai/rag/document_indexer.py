@@ -18,6 +18,7 @@ import logging
 import gc
 import psutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -27,16 +28,11 @@ if str(BACKEND_PATH) not in sys.path:
     sys.path.insert(0, str(BACKEND_PATH))
 
 from utils.alpha_api import AlphaAPIClient, get_alpha_api_client
-from .vector_db import VectorDBManager, get_vector_db_manager
+from .vector_db import VectorDBManager, VectorDBWriteError, get_vector_db_manager
 from .document_processor import DocumentProcessor, get_document_processor
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 # Memory limit: 4GB in bytes
 MAX_MEMORY_BYTES = 4 * 1024 * 1024 * 1024  # 4GB
@@ -93,6 +89,34 @@ def force_garbage_collection(step_name: str):
     logger.info(f"[GC] Freed {mem_freed:.2f} MB ({mem_before/(1024*1024):.2f}MB -> {mem_after/(1024*1024):.2f}MB)")
 
 
+# ==================== Embedding Helpers ====================
+
+def request_embeddings(
+    api_client: AlphaAPIClient,
+    texts: List[str],
+    model: Optional[str] = None
+) -> List[List[float]]:
+    """
+    Generate embeddings for texts with a single embeddings API call.
+    
+    Args:
+        api_client: AlphaAPIClient used for the request
+        texts: Texts to embed
+        model: Model name for embeddings (optional)
+        
+    Returns:
+        One embedding vector per text, in the same order
+        
+    Raises:
+        ValueError: If the response does not hold one embedding per text
+    """
+    response = api_client.embeddings(input_data=texts, model=model)
+    embeddings = api_client.extract_embeddings(response)
+    if len(embeddings) != len(texts):
+        raise ValueError(f"Expected {len(texts)} embeddings, received {len(embeddings)}")
+    return embeddings
+
+
 class DocumentIndexer:
     """
     Document Indexer for RAG system.
@@ -113,7 +137,8 @@ class DocumentIndexer:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         batch_size: int = 10,
-        processing_batch_size: int = 100
+        processing_batch_size: int = 100,
+        embedding_workers: int = 1
     ):
         """
         Initialize the Document Indexer.
@@ -127,6 +152,7 @@ class DocumentIndexer:
             chunk_overlap: Overlap between chunks (characters)
             batch_size: Number of embeddings to generate in one API call
             processing_batch_size: Number of chunks to process in memory at once (for RAM efficiency)
+            embedding_workers: Number of embedding API calls to run concurrently (default: 1)
         """
         self.vector_db = vector_db or get_vector_db_manager()
         self.document_processor = document_processor or get_document_processor()
@@ -136,6 +162,7 @@ class DocumentIndexer:
         self.chunk_overlap = chunk_overlap
         self.batch_size = batch_size
         self.processing_batch_size = processing_batch_size
+        self.embedding_workers = embedding_workers
         
         logger.info("=" * 60)
         logger.info("[INIT] Initializing DocumentIndexer")
@@ -144,6 +171,7 @@ class DocumentIndexer:
         
         logger.info(f"[INIT] Chunk size: {chunk_size}, Overlap: {chunk_overlap}")
         logger.info(f"[INIT] Batch size: {batch_size}, Processing batch size: {processing_batch_size}")
+        logger.info(f"[INIT] Embedding workers: {embedding_workers}")
         logger.info(f"[INIT] Embedding model: {embedding_model or 'default'}")
         
         log_memory_usage("After initialization")
@@ -173,7 +201,7 @@ class DocumentIndexer:
         
         log_memory_usage("Start of index_file")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Process file into chunks (with streaming to disk)
         chunks = self.document_processor.process_file(
@@ -187,7 +215,7 @@ class DocumentIndexer:
         # Generate embeddings and store in vector DB
         result = self._index_chunks(chunks)
         
-        indexing_time = time.time() - start_time
+        indexing_time = time.perf_counter() - start_time
         logger.info(f"[INDEX FILE] File indexing completed in {indexing_time:.2f} seconds")
         logger.info(f"[INDEX FILE] Total chunks indexed: {result.get('chunks_indexed', 0)}")
         
@@ -335,7 +363,7 @@ class DocumentIndexer:
         logger.info(f"[EMBEDDING] API batch size: {self.batch_size}")
         logger.info(f"[EMBEDDING] Estimated batches: {(total_chunks + self.processing_batch_size - 1) // self.processing_batch_size}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Process chunks in batches to maintain constant memory usage
         for batch_start in range(0, total_chunks, self.processing_batch_size):
@@ -353,6 +381,7 @@ class DocumentIndexer:
                 logger.warning(f"[EMBEDDING] Memory high before batch {batch_number}, forcing GC")
                 force_garbage_collection(f"Pre-batch {batch_number}")
             
+            batch_written = 0
             try:
                 # Extract batch data
                 batch_texts = [chunk['content'] for chunk in batch_chunks]
@@ -362,40 +391,23 @@ class DocumentIndexer:
                 logger.info(f"[EMBEDDING] Extracted batch data: {len(batch_texts)} texts, {len(batch_ids)} IDs, {len(batch_metadatas)} metadatas")
                 
                 # Generate embeddings for this batch only
-                batch_embeddings = []
-                api_batches = (len(batch_texts) + self.batch_size - 1) // self.batch_size
-                logger.info(f"[EMBEDDING] Will make {api_batches} API calls for this batch")
-                
-                for i in range(0, len(batch_texts), self.batch_size):
-                    api_batch_texts = batch_texts[i:i + self.batch_size]
-                    api_batch_num = i // self.batch_size + 1
-                    
-                    logger.info(f"[EMBEDDING] API call {api_batch_num}/{api_batches}: processing {len(api_batch_texts)} texts")
-                    
-                    try:
-                        response = self.api_client.embeddings(
-                            input_data=api_batch_texts,
-                            model=self.embedding_model
-                        )
-                        api_batch_embeddings = [item['embedding'] for item in response.get('data', [])]
-                        batch_embeddings.extend(api_batch_embeddings)
-                        logger.info(f"[EMBEDDING] API call {api_batch_num} successful: received {len(api_batch_embeddings)} embeddings")
-                    except Exception as e:
-                        logger.error(f"[EMBEDDING] Error generating embeddings for API batch {i}: {e}")
-                        raise
+                batch_embeddings = self._embed_texts(batch_texts)
                 
                 # Immediately insert this batch into ChromaDB
                 logger.info(f"[EMBEDDING] Inserting {len(batch_texts)} chunks into vector database")
-                self.vector_db.collection.add(
+                # Write unbuffered so every stored row is counted against this
+                # batch and no rows are left behind in the shared write buffer
+                batch_written = self.vector_db.add_documents(
                     documents=batch_texts,
                     ids=batch_ids,
                     embeddings=batch_embeddings,
-                    metadatas=batch_metadatas
+                    metadatas=batch_metadatas,
+                    buffered=False
                 )
                 
-                indexed_chunks += len(batch_chunks)
+                indexed_chunks += batch_written
                 progress = (indexed_chunks / total_chunks) * 100
-                logger.info(f"[EMBEDDING] Successfully indexed batch {batch_number}: {len(batch_chunks)} chunks (total: {indexed_chunks}/{total_chunks}, {progress:.1f}%)")
+                logger.info(f"[EMBEDDING] Successfully indexed batch {batch_number}: {batch_written} chunks (total: {indexed_chunks}/{total_chunks}, {progress:.1f}%)")
                 
                 # Clear batch variables to free memory
                 del batch_texts, batch_ids, batch_metadatas, batch_embeddings, batch_chunks
@@ -406,6 +418,9 @@ class DocumentIndexer:
                 log_memory_usage(f"After batch {batch_number}")
                 
             except Exception as e:
+                if isinstance(e, VectorDBWriteError):
+                    batch_written = e.written
+                indexed_chunks += batch_written
                 error_msg = f"Failed to process batch {batch_number} (chunks {batch_start}-{batch_end-1}): {e}"
                 logger.error(f"[EMBEDDING ERROR] {error_msg}")
                 failed_batches.append({
@@ -419,7 +434,7 @@ class DocumentIndexer:
                 logger.warning(f"[EMBEDDING] Continuing to next batch despite error")
                 continue
         
-        indexing_time = time.time() - start_time
+        indexing_time = time.perf_counter() - start_time
         
         logger.info(f"[EMBEDDING] === Embedding and indexing completed ===")
         logger.info(f"[EMBEDDING] Total time: {indexing_time:.2f} seconds")
@@ -447,6 +462,52 @@ class DocumentIndexer:
             'success_rate': indexed_chunks / total_chunks if total_chunks > 0 else 0
         }
     
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for texts via the API, in API-sized batches.
+        
+        With embedding_workers > 1 the API calls run concurrently on a
+        thread pool (the work is network-bound); results keep input order.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            One embedding vector per text, in the same order
+        """
+        api_batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        logger.info(f"[EMBEDDING] Will make {len(api_batches)} API calls for this batch")
+        
+        api_batch_nums = range(1, len(api_batches) + 1)
+        if self.embedding_workers > 1 and len(api_batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.embedding_workers, len(api_batches))) as pool:
+                results = list(pool.map(self._embed_api_batch, api_batch_nums, api_batches))
+        else:
+            results = [self._embed_api_batch(num, batch) for num, batch in zip(api_batch_nums, api_batches)]
+        
+        return [embedding for result in results for embedding in result]
+    
+    def _embed_api_batch(self, api_batch_num: int, api_batch_texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for one API batch.
+        
+        Args:
+            api_batch_num: 1-based number of this API call (for logging)
+            api_batch_texts: Texts to embed in a single API call
+            
+        Returns:
+            List of embedding vectors
+        """
+        logger.info(f"[EMBEDDING] API call {api_batch_num}: processing {len(api_batch_texts)} texts")
+        
+        try:
+            api_batch_embeddings = request_embeddings(self.api_client, api_batch_texts, self.embedding_model)
+            logger.info(f"[EMBEDDING] API call {api_batch_num} successful: received {len(api_batch_embeddings)} embeddings")
+            return api_batch_embeddings
+        except Exception as e:
+            logger.error(f"[EMBEDDING] Error generating embeddings for API batch {api_batch_num}: {e}")
+            raise
+    
     def delete_document(self, doc_id: str) -> None:
         """
         Delete a document from the vector database.
@@ -14,21 +14,29 @@ import os
 import logging
 import psutil
 import gc
+import mmap
+import struct
 import time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 # Memory limit: 4GB in bytes
 MAX_MEMORY_BYTES = 4 * 1024 * 1024 * 1024  # 4GB
 
+# Sentence terminators tried (in order) when choosing a chunk boundary
+SENTENCE_TERMINATORS = ('.', '!', '?', '\n\n')
+
+# Files written to the chunk output directory when saving chunks to disk
+CHUNKS_FILENAME = "chunks.md"
+CHUNK_OFFSETS_FILENAME = "chunk_offsets.i64"
+CHUNK_SEPARATOR = b"\n\n---\n\n"
+
+# (start, end) byte offsets of one chunk's text, as little-endian int64
+_OFFSET_PAIR = struct.Struct('<qq')
+
 
 # ==================== Memory Management Functions ====================
 
@@ -81,6 +89,93 @@ def force_garbage_collection(step_name: str):
     logger.info(f"[GC] Freed {mem_freed:.2f} MB ({mem_before/(1024*1024):.2f}MB -> {mem_after/(1024*1024):.2f}MB)")
 
 
+# ==================== Chunk Storage ====================
+
+class _ChunkWriter:
+    """
+    Append-only writer for chunks saved during chunking.
+    
+    All chunks go into one Markdown file through a single buffered handle
+    instead of one open/write/close per chunk. The byte range of each chunk's
+    text is recorded in a separate offsets file, so chunks can be read back
+    by position without parsing the Markdown.
+    
+    Offsets are held in memory and only written after the chunk bytes they
+    point to have been flushed, so the offsets file never refers to data
+    missing from the chunks file.
+    """
+    
+    def __init__(self, output_dir: str):
+        self.chunks_file = open(Path(output_dir) / CHUNKS_FILENAME, 'wb')
+        self.offsets_file = open(Path(output_dir) / CHUNK_OFFSETS_FILENAME, 'wb')
+        self.pending_offsets = bytearray()
+        self.position = 0
+        self.saved = 0
+    
+    def write(self, chunk_num: int, chunk: str) -> None:
+        """Append one chunk and record its byte range."""
+        header = f"# Chunk {chunk_num}\n\n".encode('utf-8')
+        body = chunk.encode('utf-8')
+        start = self.position + len(header)
+        end = start + len(body)
+        
+        self.chunks_file.write(header)
+        self.chunks_file.write(body)
+        self.chunks_file.write(CHUNK_SEPARATOR)
+        self.pending_offsets += _OFFSET_PAIR.pack(start, end)
+        
+        self.position = end + len(CHUNK_SEPARATOR)
+        self.saved += 1
+    
+    def flush(self) -> None:
+        """Flush buffered chunks, then record their offsets."""
+        self.chunks_file.flush()
+        self.offsets_file.write(self.pending_offsets)
+        self.offsets_file.flush()
+        self.pending_offsets.clear()
+    
+    def close(self) -> None:
+        """Flush and close both files. Safe to call more than once."""
+        if self.chunks_file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.chunks_file.close()
+            self.offsets_file.close()
+
+
+def read_saved_chunks(output_dir: str = "./chunks_output") -> Iterator[str]:
+    """
+    Read chunks saved by DocumentProcessor.iter_chunks(save_to_disk=True).
+    
+    The chunks file is memory-mapped and each chunk is decoded from its
+    recorded byte range on demand, so only one chunk is materialized at a time.
+    Output left by an interrupted run is read up to the last complete chunk:
+    a trailing partial offsets record or a range past the end of the chunks
+    file ends the iteration.
+    
+    Args:
+        output_dir: Directory the chunks were saved to
+        
+    Yields:
+        Saved chunks in document order
+    """
+    chunks_path = Path(output_dir) / CHUNKS_FILENAME
+    offsets = (Path(output_dir) / CHUNK_OFFSETS_FILENAME).read_bytes()
+    offsets = offsets[:len(offsets) - len(offsets) % _OFFSET_PAIR.size]
+    
+    # mmap cannot map an empty file
+    if not offsets or chunks_path.stat().st_size == 0:
+        return
+    
+    with open(chunks_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in _OFFSET_PAIR.iter_unpack(offsets):
+            if end > len(mm):
+                break
+            yield mm[start:end].decode('utf-8')
+
+
 # ==================== Document Processor Class ====================
 
 class DocumentProcessor:
@@ -151,9 +246,9 @@ class DocumentProcessor:
             logger.warning("[WARNING] Memory high, forcing GC before extraction")
             force_garbage_collection("Pre-extraction")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         text = extractor(file_path)
-        extraction_time = time.time() - start_time
+        extraction_time = time.perf_counter() - start_time
         
         logger.info(f"[STEP 1.4] Extraction completed in {extraction_time:.2f} seconds")
         logger.info(f"[STEP 1.5] Extracted {len(text)} characters")
@@ -219,7 +314,7 @@ class DocumentProcessor:
             Markdown formatted text
         """
         logger.info(f"[DOCX->MD] Starting DOCX to Markdown conversion")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             from docx import Document
@@ -227,29 +322,39 @@ class DocumentProcessor:
             logger.info(f"[DOCX->MD] Loading DOCX file...")
             doc = Document(file_path)
             
-            logger.info(f"[DOCX->MD] Document loaded with {len(doc.paragraphs)} paragraphs and {len(doc.tables)} tables")
+            # doc.paragraphs / doc.tables rebuild their proxy lists on every
+            # access, so read them once
+            paragraphs = doc.paragraphs
+            tables = doc.tables
+            num_paragraphs = len(paragraphs)
+            num_tables = len(tables)
+            
+            logger.info(f"[DOCX->MD] Document loaded with {num_paragraphs} paragraphs and {num_tables} tables")
             
             markdown_lines = []
             
             # Process paragraphs
             logger.info(f"[DOCX->MD] Processing paragraphs...")
             paragraph_count = 0
-            for i, paragraph in enumerate(doc.paragraphs):
-                if not paragraph.text.strip():
+            for i, paragraph in enumerate(paragraphs):
+                # paragraph.text joins all runs, so compute it once
+                paragraph_text = paragraph.text
+                if not paragraph_text.strip():
                     continue
                 
                 paragraph_count += 1
                 
                 # Check heading level
-                if paragraph.style.name.startswith('Heading'):
-                    level = int(paragraph.style.name.replace('Heading ', ''))
-                    markdown_lines.append('#' * level + ' ' + paragraph.text)
+                style_name = paragraph.style.name
+                if style_name.startswith('Heading'):
+                    level = int(style_name.replace('Heading ', ''))
+                    markdown_lines.append('#' * level + ' ' + paragraph_text)
                 else:
-                    markdown_lines.append(paragraph.text)
+                    markdown_lines.append(paragraph_text)
                 
                 # Log progress every 100 paragraphs
                 if i % 100 == 0:
-                    logger.info(f"[DOCX->MD] Processed {i}/{len(doc.paragraphs)} paragraphs")
+                    logger.info(f"[DOCX->MD] Processed {i}/{num_paragraphs} paragraphs")
                     log_memory_usage(f"Processing paragraph {i}")
                     
                     # Force GC if memory is high
@@ -260,8 +365,8 @@ class DocumentProcessor:
             
             # Process tables
             logger.info(f"[DOCX->MD] Processing tables...")
-            for table_idx, table in enumerate(doc.tables):
-                logger.info(f"[DOCX->MD] Processing table {table_idx + 1}/{len(doc.tables)}")
+            for table_idx, table in enumerate(tables):
+                logger.info(f"[DOCX->MD] Processing table {table_idx + 1}/{num_tables}")
                 
                 # Create markdown table
                 markdown_lines.append('')
@@ -292,7 +397,7 @@ class DocumentProcessor:
             # Join and return
             markdown_text = '\n'.join(markdown_lines)
             
-            conversion_time = time.time() - start_time
+            conversion_time = time.perf_counter() - start_time
             logger.info(f"[DOCX->MD] Conversion completed in {conversion_time:.2f} seconds")
             logger.info(f"[DOCX->MD] Output size: {len(markdown_text)} characters")
             logger.info(f"[DOCX->MD] Processing rate: {len(markdown_text) / conversion_time:.0f} chars/sec")
@@ -349,11 +454,42 @@ class DocumentProcessor:
         """
         Split text into overlapping chunks for embedding with streaming to disk.
         
+        Collects all chunks from iter_chunks() into a list. Prefer iter_chunks()
+        when chunks can be consumed one at a time, so the full list is never
+        held in RAM.
+        
+        Args:
+            text: Input text to chunk
+            chunk_size: Maximum size of each chunk (characters)
+            chunk_overlap: Overlap between chunks (characters)
+            output_dir: Directory to save chunk files (defaults to ./chunks_output)
+            save_to_disk: Whether to save chunks to disk (default: True)
+            
+        Returns:
+            List of text chunks
+        """
+        return list(self.iter_chunks(text, chunk_size, chunk_overlap, output_dir, save_to_disk))
+    
+    def iter_chunks(
+        self,
+        text: str,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        output_dir: Optional[str] = None,
+        save_to_disk: bool = True
+    ) -> Iterator[str]:
+        """
+        Split text into overlapping chunks, yielding them one at a time.
+        
         This method implements a streaming approach:
         - Chunks are saved to disk as they are created
-        - Only one chunk (or small batch) is in RAM at a time
+        - Only the current chunk is held in RAM by this method
         - If process is killed, already-saved chunks persist on disk
         
+        Saved chunks are appended to a single Markdown file in output_dir
+        together with a byte-offset index; read them back with
+        read_saved_chunks().
+        
         Args:
             text: Input text to chunk
             chunk_size: Maximum size of each chunk (characters)
@@ -362,7 +498,11 @@ class DocumentProcessor:
             save_to_disk: Whether to save chunks to disk (default: True)
             
         Returns:
-            List of text chunks
+            Iterator over the text chunks in document order
+            
+        Raises:
+            ValueError: If chunk_overlap is not less than chunk_size (raised
+                by this call, before any chunk is produced)
         """
         logger.info("=" * 60)
         logger.info(f"[STEP 2] Starting text chunking (streaming mode)")
@@ -378,15 +518,29 @@ class DocumentProcessor:
             raise ValueError("chunk_overlap must be less than chunk_size")
         
         # Create output directory if saving to disk
-        chunk_files = []
         if save_to_disk:
             if output_dir is None:
                 output_dir = "./chunks_output"
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             logger.info(f"[STEP 2.0] Output directory: {output_dir}")
         
-        start_time = time.time()
-        chunks = []
+        # Validation and setup above run when iter_chunks is called; the
+        # chunking loop itself runs as the caller iterates
+        return self._iter_chunks(text, chunk_size, chunk_overlap, output_dir, save_to_disk)
+    
+    def _iter_chunks(
+        self,
+        text: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        output_dir: Optional[str],
+        save_to_disk: bool
+    ) -> Iterator[str]:
+        """Generator behind iter_chunks(); arguments are already validated."""
+        chunk_writer = _ChunkWriter(output_dir) if save_to_disk else None
+        
+        start_time = time.perf_counter()
+        total_chars = 0
         start = 0
         text_length = len(text)
         
@@ -397,61 +551,69 @@ class DocumentProcessor:
         logger.info(f"[STEP 2.2] Estimated chunks: ~{(text_length / (chunk_size - chunk_overlap)):.0f}")
         
         chunk_num = 0
-        while start < text_length:
-            end = start + chunk_size
-            
-            # Try to end at a sentence boundary
-            if end < text_length:
-                # Look for sentence terminators
-                terminators = ['.', '!', '?', '\n\n']
-                for terminator in terminators:
-                    last_pos = text.rfind(terminator, start, end)
-                    # FIX: Only adjust if it's not too close to start (minimum chunk size)
-                    if last_pos != -1 and (last_pos - start) >= min_chunk_size:
-                        end = last_pos + 1
-                        break
-            
-            chunk = text[start:end].strip()
-            
-            if chunk:
-                chunks.append(chunk)
-                chunk_num += 1
+        try:
+            while start < text_length:
+                end = start + chunk_size
                 
-                # Save to disk immediately if enabled
-                if save_to_disk:
-                    chunk_filename = f"{output_dir}/chunk_{chunk_num:06d}.md"
-                    try:
-                        with open(chunk_filename, 'w', encoding='utf-8') as f:
-                            f.write(f"# Chunk {chunk_num}\n\n")
-                            f.write(chunk)
-                            f.write("\n\n---\n\n")
-                        chunk_files.append(chunk_filename)
-                        
-                        # Log progress every 100 chunks
-                        if chunk_num % 100 == 0:
-                            logger.info(f"[STEP 2.3] Created {chunk_num} chunks, saved to disk...")
-                            log_memory_usage(f"Chunking progress: {chunk_num}")
+                # Try to end at a sentence boundary
+                if end < text_length:
+                    # Look for sentence terminators
+                    for terminator in SENTENCE_TERMINATORS:
+                        last_pos = text.rfind(terminator, start, end)
+                        # FIX: Only adjust if it's not too close to start (minimum chunk size)
+                        if last_pos != -1 and (last_pos - start) >= min_chunk_size:
+                            end = last_pos + 1
+                            break
+                
+                chunk = text[start:end].strip()
+                
+                if chunk:
+                    chunk_num += 1
+                    total_chars += len(chunk)
+                    
+                    # Save to disk immediately if enabled
+                    if chunk_writer is not None and not chunk_writer.chunks_file.closed:
+                        try:
+                            chunk_writer.write(chunk_num, chunk)
                             
-                            # Force GC if memory is high
-                            if not check_memory_limit(f"Chunk {chunk_num}"):
-                                force_garbage_collection(f"After chunk {chunk_num}")
-                    except Exception as e:
-                        logger.error(f"[ERROR] Failed to save chunk {chunk_num}: {e}")
-            
-            # FIX: Ensure we always advance forward
-            new_start = end - chunk_overlap
-            if new_start <= start:
-                # Force minimum advance if overlap causes stall
-                new_start = start + min_chunk_size
-                logger.warning(f"[STEP 2.4] Chunk {chunk_num} too small, forcing advance to {new_start}")
-            start = new_start
-        
-        chunking_time = time.time() - start_time
+                            # Log progress every 100 chunks
+                            if chunk_num % 100 == 0:
+                                # Push buffered chunks to disk so they survive if the process is killed
+                                chunk_writer.flush()
+                                logger.info(f"[STEP 2.3] Created {chunk_num} chunks, saved to disk...")
+                                log_memory_usage(f"Chunking progress: {chunk_num}")
+                                
+                                # Force GC if memory is high
+                                if not check_memory_limit(f"Chunk {chunk_num}"):
+                                    force_garbage_collection(f"After chunk {chunk_num}")
+                        except Exception as e:
+                            # A partial write leaves the file position unknown, so
+                            # keep the chunks saved so far and stop saving
+                            logger.error(f"[ERROR] Failed to save chunk {chunk_num}, no further chunks will be saved: {e}")
+                            try:
+                                chunk_writer.close()
+                            except Exception as close_error:
+                                logger.error(f"[ERROR] Failed to close chunk files: {close_error}")
+                    
+                    yield chunk
+                
+                # FIX: Ensure we always advance forward
+                new_start = end - chunk_overlap
+                if new_start <= start:
+                    # Force minimum advance if overlap causes stall
+                    new_start = start + min_chunk_size
+                    logger.warning(f"[STEP 2.4] Chunk {chunk_num} too small, forcing advance to {new_start}")
+                start = new_start
+        finally:
+            if chunk_writer is not None:
+                chunk_writer.close()
+        
+        chunking_time = time.perf_counter() - start_time
         logger.info(f"[STEP 2.5] Chunking completed in {chunking_time:.2f} seconds")
-        logger.info(f"[STEP 2.6] Created {len(chunks)} chunks")
-        logger.info(f"[STEP 2.7] Saved {len(chunk_files)} chunks to disk" if save_to_disk else "[STEP 2.7] Disk saving disabled")
-        logger.info(f"[STEP 2.8] Average chunk size: {sum(len(c) for c in chunks) / len(chunks):.0f} characters")
-        logger.info(f"[STEP 2.9] Chunking rate: {len(chunks) / chunking_time:.0f} chunks/sec")
+        logger.info(f"[STEP 2.6] Created {chunk_num} chunks")
+        logger.info(f"[STEP 2.7] Saved {chunk_writer.saved} chunks to disk" if save_to_disk else "[STEP 2.7] Disk saving disabled")
+        logger.info(f"[STEP 2.8] Average chunk size: {total_chars / max(chunk_num, 1):.0f} characters")
+        logger.info(f"[STEP 2.9] Chunking rate: {chunk_num / chunking_time:.0f} chunks/sec")
         
         log_memory_usage("After chunking")
         
@@ -461,8 +623,6 @@ class DocumentProcessor:
         logger.info("=" * 60)
         logger.info(f"[STEP 2.10] Chunks saved to: {output_dir}" if save_to_disk else "[STEP 2.10] Chunks in memory only")
         logger.info("=" * 60)
-        
-        return chunks
     
     def process_file(
         self,
@@ -496,7 +656,7 @@ class DocumentProcessor:
         
         log_memory_usage("Start of process_file")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Extract text
         text = self.extract_text(file_path)
@@ -544,7 +704,7 @@ class DocumentProcessor:
                 if not check_memory_limit(f"Document {i + 1}"):
                     force_garbage_collection(f"After document {i + 1}")
         
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.info(f"[STEP 4] File processing completed")
         logger.info(f"[STEP 4.1] Total time: {processing_time:.2f} seconds")
         logger.info(f"[STEP 4.2] Created {len(documents)} document objects")
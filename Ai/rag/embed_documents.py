@@ -6,6 +6,7 @@ using the Alpha API from back-end and storing them in the vector database.
 
 Usage:
     python embed_documents.py --file path/to/document.pdf
+    python embed_documents.py --file path/to/document.pdf --pipeline
     python embed_documents.py --directory path/to/docs/
     python embed_documents.py --text "Your text here" --doc_id my_doc
 """
@@ -27,24 +28,31 @@ if str(BACKEND_PATH) not in sys.path:
     sys.path.insert(0, str(BACKEND_PATH))
 
 from .document_indexer import get_document_indexer
+from .pipeline import IngestPipeline
 from .vector_db import get_vector_db_manager
 
 
-def embed_file(file_path: str, metadata: dict = None) -> dict:
+def embed_file(file_path: str, metadata: dict = None, use_pipeline: bool = False, **pipeline_kwargs) -> dict:
     """
     Embed a single document file.
     
     Args:
         file_path: Path to the document file
         metadata: Optional metadata dictionary
+        use_pipeline: Use the parallel IngestPipeline instead of DocumentIndexer
+        **pipeline_kwargs: IngestPipeline options (chunk_size, chunk_overlap, ...)
         
     Returns:
         Indexing result
     """
     logger.info(f"Embedding file: {file_path}")
     
-    indexer = get_document_indexer()
-    result = indexer.index_file(file_path, metadata=metadata)
+    if use_pipeline:
+        pipeline = IngestPipeline(**pipeline_kwargs)
+        result = pipeline.ingest_file(file_path, metadata=metadata)
+    else:
+        indexer = get_document_indexer()
+        result = indexer.index_file(file_path, metadata=metadata)
     
     logger.info(f"Successfully embedded {result['chunks_indexed']} chunks")
     return result
@@ -142,6 +150,9 @@ Examples:
   # Embed a single PDF file
   python embed_documents.py --file document.pdf
   
+  # Embed a large file with the parallel ingest pipeline
+  python embed_documents.py --file document.docx --pipeline
+  
   # Embed all PDFs in a directory
   python embed_documents.py --directory ./docs --patterns "*.pdf"
   
@@ -193,6 +204,11 @@ Examples:
         default=True,
         help='Search directories recursively (default: True)'
     )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Embed --file with the parallel ingest pipeline (chunking, embedding and storing overlap)'
+    )
     parser.add_argument(
         '--doc-id',
         help='Document ID for text embedding'
@@ -249,7 +265,14 @@ Examples:
         elif args.clear:
             clear_database()
         elif args.file:
-            embed_file(args.file, metadata)
+            embed_file(
+                args.file,
+                metadata,
+                use_pipeline=args.pipeline,
+                chunk_size=args.chunk_size,
+                chunk_overlap=args.chunk_overlap,
+                embed_batch_size=args.batch_size
+            )
         elif args.directory:
             patterns = args.patterns if args.patterns else None
             embed_directory(args.directory, patterns, args.recursive)
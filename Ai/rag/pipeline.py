@@ -0,0 +1,319 @@
+"""
+Parallel ingest pipeline for RAG system.
+
+This module indexes a document with three overlapping stages connected by
+bounded queues:
+1. Chunking - splits the extracted text into chunks (CPU)
+2. Embedding - generates embeddings via Alpha API (network I/O, worker pool)
+3. Upserting - stores chunks in the vector database (disk I/O)
+
+Unlike DocumentIndexer, which runs the stages one after another, the stages
+here run concurrently, so total time approaches the slowest stage instead of
+the sum of all stages. Bounded queues keep memory usage constant regardless
+of document size.
+"""
+import sys
+import logging
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+
+# Add back-end to path for API imports
+BACKEND_PATH = Path(__file__).parent.parent.parent / "back-end"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.insert(0, str(BACKEND_PATH))
+
+from utils.alpha_api import AlphaAPIClient, get_alpha_api_client
+from .vector_db import VectorDBManager, VectorDBWriteError, get_vector_db_manager
+from .document_processor import DocumentProcessor, get_document_processor, log_memory_usage
+from .document_indexer import request_embeddings
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Marks the end of a stage's output on a queue
+_EOF = None
+
+
+class IngestPipeline:
+    """
+    Parallel ingest pipeline for RAG system.
+
+    Runs chunking, embedding and upserting in separate threads:
+    - One chunker thread groups chunks into embedding batches
+    - A pool of embedder threads calls the embeddings API concurrently
+    - One upserter thread combines embedded batches into larger
+      vector database writes
+
+    Embedding batch size (API request size) and upsert batch size
+    (vector database write size) are configured independently.
+
+    Chunks get the same IDs and metadata as with DocumentIndexer, except
+    that metadata has no 'total_chunks' key: chunks are stored before the
+    document has been fully chunked, so the total is not known yet. It is
+    returned in the ingest_file() result instead.
+    """
+
+    def __init__(
+        self,
+        vector_db: Optional[VectorDBManager] = None,
+        document_processor: Optional[DocumentProcessor] = None,
+        api_client: Optional[AlphaAPIClient] = None,
+        embedding_model: Optional[str] = None,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        embed_batch_size: int = 10,
+        upsert_batch_size: int = 250,
+        embed_workers: int = 2,
+        queue_size: int = 4
+    ):
+        """
+        Initialize the Ingest Pipeline.
+
+        Args:
+            vector_db: VectorDBManager instance (uses singleton if not provided)
+            document_processor: DocumentProcessor instance (uses singleton if not provided)
+            api_client: AlphaAPIClient instance (uses singleton if not provided)
+            embedding_model: Model name for embeddings
+            chunk_size: Maximum size of each chunk (characters)
+            chunk_overlap: Overlap between chunks (characters)
+            embed_batch_size: Number of chunks sent in one embeddings API call
+            upsert_batch_size: Number of chunks written to the vector database at once
+            embed_workers: Number of threads calling the embeddings API
+            queue_size: Maximum number of batches waiting between two stages
+        """
+        # Validate up front: errors inside the stage threads are only
+        # recorded as failed batches
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be less than chunk_size")
+        if embed_batch_size < 1 or upsert_batch_size < 1:
+            raise ValueError("embed_batch_size and upsert_batch_size must be at least 1")
+        if embed_workers < 1:
+            raise ValueError("embed_workers must be at least 1")
+
+        self.vector_db = vector_db or get_vector_db_manager()
+        self.document_processor = document_processor or get_document_processor()
+        self.api_client = api_client or get_alpha_api_client()
+        self.embedding_model = embedding_model
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.embed_workers = embed_workers
+        self.queue_size = queue_size
+
+        logger.info(f"[PIPELINE] Embed batch size: {embed_batch_size}, Upsert batch size: {upsert_batch_size}")
+        logger.info(f"[PIPELINE] Embed workers: {embed_workers}, Queue size: {queue_size}")
+
+    def ingest_file(
+        self,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        save_chunks_to_disk: bool = True,
+        chunks_output_dir: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Index a single document file using the parallel pipeline.
+
+        Args:
+            file_path: Path to the document file
+            metadata: Additional metadata to include
+            save_chunks_to_disk: Whether to save chunks to disk while chunking
+            chunks_output_dir: Directory to save chunk files (defaults to ./chunks_output)
+
+        Returns:
+            Dictionary with indexing results
+        """
+        logger.info("=" * 60)
+        logger.info(f"[PIPELINE] Starting parallel ingest")
+        logger.info(f"File: {file_path}")
+
+        log_memory_usage("Start of ingest_file")
+
+        start_time = time.perf_counter()
+
+        text = self.document_processor.extract_text(file_path)
+
+        path = Path(file_path)
+        base_metadata = {
+            'filename': path.name,
+            'file_path': str(path),
+            'file_size': path.stat().st_size,
+            'file_type': path.suffix.lower(),
+        }
+        if metadata:
+            base_metadata.update(metadata)
+
+        q_embed: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        q_upsert: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stats = {'total_chunks': 0, 'chunks_indexed': 0, 'failed_batches': []}
+
+        threads = [
+            threading.Thread(
+                target=self._chunk_stage,
+                args=(text, path.stem, base_metadata, save_chunks_to_disk, chunks_output_dir, q_embed, stats),
+                name="ingest-chunker",
+                daemon=True
+            ),
+            threading.Thread(
+                target=self._upsert_stage,
+                args=(q_upsert, stats),
+                name="ingest-upserter",
+                daemon=True
+            ),
+        ]
+        threads.extend(
+            threading.Thread(
+                target=self._embed_stage,
+                args=(q_embed, q_upsert, stats),
+                name=f"ingest-embedder-{i}",
+                daemon=True
+            )
+            for i in range(self.embed_workers)
+        )
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total_chunks = stats['total_chunks']
+        indexed_chunks = stats['chunks_indexed']
+        failed_batches = stats['failed_batches']
+
+        indexing_time = time.perf_counter() - start_time
+        logger.info(f"[PIPELINE] Parallel ingest completed in {indexing_time:.2f} seconds")
+        logger.info(f"[PIPELINE] Indexed: {indexed_chunks}/{total_chunks} chunks successfully")
+
+        if failed_batches:
+            logger.warning(f"[PIPELINE] Failed batches: {len(failed_batches)}")
+            for batch in failed_batches:
+                logger.warning(f"[PIPELINE]   {batch['stage']} stage ({batch['size']} chunks): {batch['error']}")
+
+        log_memory_usage("End of ingest_file")
+
+        logger.info("=" * 60)
+
+        return {
+            'chunks_indexed': indexed_chunks,
+            'total_chunks': total_chunks,
+            'failed_batches': len(failed_batches),
+            'success_rate': indexed_chunks / total_chunks if total_chunks > 0 else 0
+        }
+
+    def _chunk_stage(
+        self,
+        text: str,
+        doc_stem: str,
+        base_metadata: Dict[str, Any],
+        save_to_disk: bool,
+        output_dir: Optional[str],
+        q_embed: queue.Queue,
+        stats: Dict[str, Any]
+    ) -> None:
+        """Split text into chunks and push embedding-sized batches to q_embed."""
+        batch: List[Dict[str, Any]] = []
+        try:
+            chunks = self.document_processor.iter_chunks(
+                text,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                output_dir=output_dir,
+                save_to_disk=save_to_disk
+            )
+            for i, chunk in enumerate(chunks):
+                chunk_metadata = base_metadata.copy()
+                chunk_metadata['chunk_id'] = i
+                chunk_metadata['chunk_index'] = i
+
+                batch.append({
+                    'content': chunk,
+                    'metadata': chunk_metadata,
+                    'id': f"{doc_stem}_chunk_{i}"
+                })
+                stats['total_chunks'] += 1
+
+                if len(batch) >= self.embed_batch_size:
+                    q_embed.put(batch)
+                    batch = []
+
+            if batch:
+                q_embed.put(batch)
+        except Exception as e:
+            logger.error(f"[PIPELINE] Chunking failed: {e}")
+            stats['failed_batches'].append({'stage': 'chunk', 'size': len(batch), 'error': str(e)})
+        finally:
+            # One end marker per embedder so every worker stops
+            for _ in range(self.embed_workers):
+                q_embed.put(_EOF)
+
+    def _embed_stage(self, q_embed: queue.Queue, q_upsert: queue.Queue, stats: Dict[str, Any]) -> None:
+        """Generate embeddings for batches from q_embed and push them to q_upsert."""
+        try:
+            while True:
+                batch = q_embed.get()
+                if batch is _EOF:
+                    break
+
+                try:
+                    embeddings = request_embeddings(
+                        self.api_client,
+                        [chunk['content'] for chunk in batch],
+                        self.embedding_model
+                    )
+                    q_upsert.put((batch, embeddings))
+                except Exception as e:
+                    logger.error(f"[PIPELINE] Embedding failed for batch of {len(batch)} chunks: {e}")
+                    stats['failed_batches'].append({'stage': 'embed', 'size': len(batch), 'error': str(e)})
+        finally:
+            q_upsert.put(_EOF)
+
+    def _upsert_stage(self, q_upsert: queue.Queue, stats: Dict[str, Any]) -> None:
+        """Combine embedded batches from q_upsert and write them to the vector database."""
+        documents: List[str] = []
+        ids: List[str] = []
+        embeddings: List[List[float]] = []
+        metadatas: List[Dict[str, Any]] = []
+
+        def write() -> None:
+            # Write unbuffered: upserts are already batched here, and the
+            # shared manager's buffer may hold other callers' documents
+            try:
+                written = self.vector_db.add_documents(
+                    documents=documents,
+                    ids=ids,
+                    embeddings=embeddings,
+                    metadatas=metadatas,
+                    buffered=False
+                )
+                logger.info(f"[PIPELINE] Upserted {written} chunks (total: {stats['chunks_indexed'] + written})")
+            except Exception as e:
+                written = e.written if isinstance(e, VectorDBWriteError) else 0
+                logger.error(f"[PIPELINE] Upsert failed for {len(ids) - written} chunks: {e}")
+                stats['failed_batches'].append({'stage': 'upsert', 'size': len(ids) - written, 'error': str(e)})
+            stats['chunks_indexed'] += written
+            documents.clear()
+            ids.clear()
+            embeddings.clear()
+            metadatas.clear()
+
+        finished_embedders = 0
+        while finished_embedders < self.embed_workers:
+            item = q_upsert.get()
+            if item is _EOF:
+                finished_embedders += 1
+                continue
+
+            batch, batch_embeddings = item
+            documents.extend(chunk['content'] for chunk in batch)
+            ids.extend(chunk['id'] for chunk in batch)
+            metadatas.extend(chunk['metadata'] for chunk in batch)
+            embeddings.extend(batch_embeddings)
+
+            if len(ids) >= self.upsert_batch_size:
+                write()
+
+        if ids:
+            write()
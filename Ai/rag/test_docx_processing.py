@@ -9,6 +9,7 @@ This script demonstrates the enhanced document processing pipeline:
 """
 import sys
 import os
+import logging
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -17,6 +18,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from Ai.rag.document_processor import DocumentProcessor, get_document_processor
 from Ai.rag.document_indexer import DocumentIndexer, get_document_indexer
 
+# Configure logging (library modules no longer do this on import)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
 
 def test_docx_conversion():
     """Test DOCX to Markdown conversion."""
@@ -60,13 +68,21 @@ def test_docx_conversion():
         print("-" * 80)
         print()
         
-        chunks = processor.chunk_text(text, chunk_size=1000, chunk_overlap=200, save_to_disk=True)
+        # Stream chunks instead of materializing the full list
+        num_chunks = 0
+        total_chars = 0
+        first_chunk = ""
+        for chunk in processor.iter_chunks(text, chunk_size=1000, chunk_overlap=200, save_to_disk=True):
+            if num_chunks == 0:
+                first_chunk = chunk
+            num_chunks += 1
+            total_chars += len(chunk)
         
         print()
         print(f"✓ Successfully created chunks")
-        print(f"  - Total chunks: {len(chunks)}")
-        print(f"  - Average chunk size: {sum(len(c) for c in chunks) / len(chunks):.0f} chars")
-        print(f"  - First chunk preview: {chunks[0][:150]}...")
+        print(f"  - Total chunks: {num_chunks}")
+        print(f"  - Average chunk size: {total_chars / max(num_chunks, 1):.0f} chars")
+        print(f"  - First chunk preview: {first_chunk[:150]}...")
         print()
         
         # Test 3: DocumentProcessor full process_file (streaming to disk)
@@ -138,7 +154,7 @@ def test_docx_conversion():
         print("  • Memory checked and GC triggered when needed")
         print()
         print("To disable disk saving:")
-        print("  processor.chunk_text(text, chunk_size, chunk_overlap, save_to_disk=False)")
+        print("  processor.iter_chunks(text, chunk_size, chunk_overlap, save_to_disk=False)")
         print("  processor.process_file(file_path, save_chunks_to_disk=False)")
         print()
         
@@ -3,21 +3,75 @@ Vector Database Manager using ChromaDB.
 
 This module provides a wrapper around ChromaDB for storing
 and retrieving document embeddings.
+
+ChromaDB can run in-process (client_mode="persistent", default) or as a
+separate server (client_mode="http"). Server mode moves SQLite/HNSW writes
+out of the indexing process; start the server with:
+
+    chroma run --path ./vector_db --port 8001
+
+and set VECTOR_DB_MODE=http, VECTOR_DB_HOST and VECTOR_DB_PORT.
 """
 import os
 import logging
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
 import chromadb
 from chromadb.config import Settings
-
-# Load environment variables
 from dotenv import load_dotenv
-load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Allowed range for add_documents batching (ChromaDB recommends 50-250 per add)
+MIN_BATCH_SIZE = 1
+MAX_BATCH_SIZE = 250
+
+# Supported ChromaDB client modes
+CLIENT_MODES = ('persistent', 'http')
+
+# Number of document IDs fetched and deleted per round in clear_collection
+CLEAR_PAGE_SIZE = 5000
+
+# HNSW index defaults, applied when the collection is first created.
+# hnsw:batch_size / hnsw:sync_threshold control how often Chroma moves new
+# vectors from its brute-force buffer into the HNSW index and persists it;
+# raising them keeps add() from slowing down as the collection grows.
+HNSW_SPACE = "l2"
+HNSW_CONSTRUCTION_EF = 100
+HNSW_M = 16
+HNSW_BATCH_SIZE = 500
+HNSW_SYNC_THRESHOLD = 2000
+
+
+def _chroma_version() -> tuple:
+    """Installed ChromaDB version as (major, minor), (0, 0) if unknown."""
+    parts = []
+    for part in getattr(chromadb, "__version__", "0.0").split(".")[:2]:
+        digits = "".join(c for c in part if c.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts + [0] * (2 - len(parts)))
+
+
+# ChromaDB 0.6+ stores embeddings as numpy arrays and takes an ndarray as is;
+# older releases validate embeddings as Python lists
+CHROMA_ACCEPTS_NDARRAY = _chroma_version() >= (0, 6)
+
+
+class VectorDBWriteError(Exception):
+    """
+    A collection write failed partway through add_documents() or flush().
+    
+    Attributes:
+        written: Number of documents the call stored before the failure
+    """
+    
+    def __init__(self, written: int, error: Exception):
+        super().__init__(f"{error} ({written} documents written before the failure)")
+        self.written = written
+
 
 class VectorDBManager:
     """
@@ -31,7 +85,17 @@ class VectorDBManager:
         self,
         collection_name: str = "documents",
         persist_directory: str = None,
-        embedding_function=None
+        embedding_function=None,
+        batch_size: Optional[int] = None,
+        client_mode: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        hnsw_space: str = HNSW_SPACE,
+        hnsw_construction_ef: int = HNSW_CONSTRUCTION_EF,
+        hnsw_m: int = HNSW_M,
+        hnsw_batch_size: int = HNSW_BATCH_SIZE,
+        hnsw_sync_threshold: int = HNSW_SYNC_THRESHOLD,
+        embedding_dim: Optional[int] = None
     ):
         """
         Initialize the Vector DB Manager.
@@ -40,68 +104,294 @@ class VectorDBManager:
             collection_name: Name of the ChromaDB collection
             persist_directory: Directory to persist the vector database (optional, uses env var if not provided)
             embedding_function: Custom embedding function (optional)
+            batch_size: Number of documents per ChromaDB write (1-250). When not
+                provided, every add_documents call is written immediately as-is.
+            client_mode: 'persistent' (in-process) or 'http' (ChromaDB server)
+                (optional, uses VECTOR_DB_MODE env var if not provided)
+            host: ChromaDB server host for 'http' mode (optional, uses env var if not provided)
+            port: ChromaDB server port for 'http' mode (optional, uses env var if not provided)
+            hnsw_space: Distance function of the HNSW index ('l2', 'cosine' or 'ip')
+            hnsw_construction_ef: Candidate list size while building the index
+            hnsw_m: Number of neighbours per node in the index graph
+            hnsw_batch_size: Vectors buffered in memory before being added to the index
+            hnsw_sync_threshold: Vectors added before the index is persisted to disk
+            embedding_dim: Expected embedding dimension; when set, add_documents
+                rejects embeddings of any other size (optional)
+            
+        Note:
+            HNSW settings only take effect when the collection is created; an
+            existing collection keeps the settings it was created with.
         """
+        # Load environment variables (values already set in the process win)
+        load_dotenv()
+        
+        if batch_size is not None and not MIN_BATCH_SIZE <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(
+                f"batch_size must be between {MIN_BATCH_SIZE} and {MAX_BATCH_SIZE}"
+            )
+        
+        if client_mode is None:
+            client_mode = os.getenv('VECTOR_DB_MODE', 'persistent')
+        if client_mode not in CLIENT_MODES:
+            raise ValueError(
+                f"Unsupported client_mode: {client_mode}. "
+                f"Supported modes: {', '.join(CLIENT_MODES)}"
+            )
+        
         self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.embedding_dim = embedding_dim
         # Use environment variable if persist_directory not provided
         if persist_directory is None:
             persist_directory = os.getenv('VECTOR_DB_PATH', './vector_db')
         self.persist_directory = Path(persist_directory)
         self.embedding_function = embedding_function
+        self.client_mode = client_mode
+        self.host = host or os.getenv('VECTOR_DB_HOST', 'localhost')
+        self.port = port or int(os.getenv('VECTOR_DB_PORT', '8001'))
+        self.hnsw_metadata = {
+            "hnsw:space": hnsw_space,
+            "hnsw:construction_ef": hnsw_construction_ef,
+            "hnsw:M": hnsw_m,
+            "hnsw:batch_size": hnsw_batch_size,
+            "hnsw:sync_threshold": hnsw_sync_threshold,
+        }
+        
+        # Pending documents waiting to be written in one collection.add call
+        # (only used when batch_size is set; guarded by _buf_lock because the
+        # manager is shared across threads)
+        self._buf_lock = threading.Lock()
+        self._buf_docs: List[str] = []
+        self._buf_ids: List[str] = []
+        self._buf_emb: List[np.ndarray] = []
+        self._buf_meta: List[Dict[str, Any]] = []
+        
+        # ChromaDB client and collection are created on first use, so
+        # constructing the manager does not open the database
+        self._client = None
+        self._collection = None
+        self._init_lock = threading.Lock()
+        
+        logger.info("VectorDBManager initialized with collection '%s' (%s mode)", collection_name, client_mode)
+    
+    @property
+    def client(self):
+        """ChromaDB client, created on first access."""
+        if self._client is None:
+            with self._init_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+    
+    @property
+    def collection(self):
+        """ChromaDB collection, created on first access."""
+        if self._collection is None:
+            client = self.client
+            with self._init_lock:
+                if self._collection is None:
+                    self._collection = self._get_or_create_collection(client)
+        return self._collection
+    
+    def _create_client(self):
+        """Create the ChromaDB client for the configured mode."""
+        # allow_reset stays off: client.reset() deletes every collection on
+        # disk; use clear_collection()/reset_database() instead
+        settings = Settings(
+            anonymized_telemetry=False,
+            allow_reset=False
+        )
+        if self.client_mode == 'http':
+            return chromadb.HttpClient(
+                host=self.host,
+                port=self.port,
+                settings=settings
+            )
         
         # Create persist directory if it doesn't exist
         self.persist_directory.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
+        return chromadb.PersistentClient(
             path=str(self.persist_directory),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
+            settings=settings
         )
-        
-        # Get or create collection
-        self.collection = self._get_or_create_collection()
-        
-        logger.info(f"VectorDBManager initialized with collection '{collection_name}'")
     
-    def _get_or_create_collection(self):
+    def _get_or_create_collection(self, client):
         """Get existing collection or create new one."""
-        try:
-            collection = self.client.get_collection(name=self.collection_name)
-            logger.info(f"Loaded existing collection '{self.collection_name}'")
-            return collection
-        except Exception:
-            collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"description": "Document embeddings for RAG system"}
-            )
-            logger.info(f"Created new collection '{self.collection_name}'")
-            return collection
+        collection = client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={
+                "description": "Document embeddings for RAG system",
+                **self.hnsw_metadata
+            }
+        )
+        logger.info("Using collection '%s'", self.collection_name)
+        return collection
     
     def add_documents(
         self,
         documents: List[str],
         ids: List[str],
         embeddings: Optional[List[List[float]]] = None,
-        metadatas: Optional[List[Dict[str, Any]]] = None
-    ) -> None:
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        buffered: bool = True
+    ) -> int:
         """
         Add documents to the vector database.
         
+        If ``batch_size`` is set and ``buffered`` is True, documents are
+        buffered and written in groups of ``batch_size``; call ``flush()``
+        after the last batch to write any remainder. Buffered documents are
+        written (and counted) by whichever call fills the buffer, which may
+        belong to another caller of the shared manager. With
+        ``buffered=False`` only this call's documents are written, right away,
+        in groups of at most ``batch_size``.
+        
+        If a write fails, VectorDBWriteError is raised with the number of
+        documents this call stored before the failure. The documents of the
+        failed write are dropped, and this call's documents that were not
+        written yet are removed from the buffer, so no later call writes them.
+        
         Args:
             documents: List of document texts
             ids: List of unique document IDs
-            embeddings: Pre-computed embeddings (optional)
+            embeddings: Pre-computed embeddings, stored as float32 (optional)
             metadatas: List of metadata dictionaries (optional)
+            buffered: Whether to use the shared write buffer (default: True)
+            
+        Returns:
+            Number of documents written to the collection by this call
+            
+        Raises:
+            ValueError: If the inputs do not line up
+            VectorDBWriteError: If a write to the collection fails
         """
         if len(documents) != len(ids):
             raise ValueError("Number of documents must match number of IDs")
         
+        if embeddings is not None and len(embeddings) > 0:
+            embeddings = self._to_embedding_array(embeddings)
+            if len(embeddings) != len(documents):
+                raise ValueError("Number of embeddings must match number of documents")
+        else:
+            embeddings = None
+        
         if metadatas and len(metadatas) != len(documents):
             raise ValueError("Number of metadatas must match number of documents")
         
-        # Add documents to collection
+        if self.batch_size is None or not buffered:
+            return self._write_direct(documents, ids, embeddings, metadatas or None)
+        
+        written = 0
+        with self._buf_lock:
+            try:
+                # A single collection.add needs embeddings/metadatas for all or none of
+                # the documents, so write out pending ones if this call differs
+                if self._buf_ids and (
+                    (embeddings is not None) != bool(self._buf_emb)
+                    or bool(metadatas) != bool(self._buf_meta)
+                ):
+                    written += self._write_buffered(len(self._buf_ids))
+                
+                self._buf_docs.extend(documents)
+                self._buf_ids.extend(ids)
+                if embeddings is not None:
+                    self._buf_emb.extend(embeddings)
+                if metadatas:
+                    self._buf_meta.extend(metadatas)
+                
+                while len(self._buf_ids) >= self.batch_size:
+                    written += self._write_buffered(self.batch_size)
+            except Exception as e:
+                # This call's documents sit at the end of the buffer; drop the
+                # ones not written yet so a later call does not write them
+                keep = max(len(self._buf_ids) - len(documents), 0)
+                del self._buf_docs[keep:]
+                del self._buf_ids[keep:]
+                del self._buf_emb[keep:]
+                del self._buf_meta[keep:]
+                raise VectorDBWriteError(written, e) from e
+        
+        return written
+    
+    def _write_direct(
+        self,
+        documents: List[str],
+        ids: List[str],
+        embeddings: Optional[np.ndarray],
+        metadatas: Optional[List[Dict[str, Any]]]
+    ) -> int:
+        """Write documents without the buffer, in groups of at most ``batch_size``."""
+        step = self.batch_size or max(len(documents), 1)
+        written = 0
+        try:
+            for start in range(0, len(documents), step):
+                end = start + step
+                self._add_batch(
+                    documents[start:end],
+                    ids[start:end],
+                    embeddings[start:end] if embeddings is not None else None,
+                    metadatas[start:end] if metadatas else None
+                )
+                written += len(ids[start:end])
+        except Exception as e:
+            raise VectorDBWriteError(written, e) from e
+        return written
+    
+    def _to_embedding_array(self, embeddings) -> np.ndarray:
+        """Convert embeddings to one float32 array and check their dimension."""
+        array = np.asarray(embeddings, dtype=np.float32)
+        if array.ndim != 2:
+            raise ValueError("Embeddings must be a list of equal-length vectors")
+        if self.embedding_dim is not None and array.shape[1] != self.embedding_dim:
+            raise ValueError(
+                f"Embedding dimension {array.shape[1]} does not match "
+                f"embedding_dim {self.embedding_dim}"
+            )
+        return array
+    
+    def flush(self) -> int:
+        """
+        Write all buffered documents to the vector database.
+        
+        Returns:
+            Number of documents written
+            
+        Raises:
+            VectorDBWriteError: If the write fails (the buffered documents are dropped)
+        """
+        with self._buf_lock:
+            if not self._buf_ids:
+                return 0
+            try:
+                return self._write_buffered(len(self._buf_ids))
+            except Exception as e:
+                raise VectorDBWriteError(0, e) from e
+    
+    def _write_buffered(self, n: int) -> int:
+        """Write the first ``n`` buffered documents with a single add call (caller holds _buf_lock)."""
+        documents, self._buf_docs = self._buf_docs[:n], self._buf_docs[n:]
+        ids, self._buf_ids = self._buf_ids[:n], self._buf_ids[n:]
+        rows, self._buf_emb = self._buf_emb[:n], self._buf_emb[n:]
+        metadatas, self._buf_meta = self._buf_meta[:n] or None, self._buf_meta[n:]
+        
+        # Buffered rows may come from several add_documents calls; stack them
+        # into one contiguous array for this write
+        embeddings = np.stack(rows) if rows else None
+        
+        self._add_batch(documents, ids, embeddings, metadatas)
+        return len(documents)
+    
+    def _add_batch(
+        self,
+        documents: List[str],
+        ids: List[str],
+        embeddings: Optional[np.ndarray] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """Add one batch of documents (embeddings as one float32 array) to the collection."""
+        if embeddings is not None and not CHROMA_ACCEPTS_NDARRAY:
+            embeddings = embeddings.tolist()
+        
         self.collection.add(
             documents=documents,
             ids=ids,
@@ -109,7 +399,7 @@ class VectorDBManager:
             metadatas=metadatas
         )
         
-        logger.info(f"Added {len(documents)} documents to vector database")
+        logger.info("Added %d documents to vector database", len(documents))
     
     def query(
         self,
@@ -124,7 +414,9 @@ class VectorDBManager:
         
         Args:
             query_embeddings: Query embeddings (optional)
-            query_texts: Query texts (optional, will be embedded if provided)
+            query_texts: Query texts (deprecated; embedded in-process by ChromaDB's
+                embedding function on every call - embed the query once and pass
+                query_embeddings instead)
             n_results: Number of results to return
             where: Filter on metadata
             where_document: Filter on document content
@@ -132,6 +424,11 @@ class VectorDBManager:
         Returns:
             Dictionary with query results
         """
+        if query_texts is not None:
+            logger.warning(
+                "query_texts is deprecated; embed the query and pass query_embeddings instead"
+            )
+        
         results = self.collection.query(
             query_embeddings=query_embeddings,
             query_texts=query_texts,
@@ -140,7 +437,9 @@ class VectorDBManager:
             where_document=where_document
         )
         
-        logger.info(f"Query returned {len(results.get('ids', [[]])[0])} results")
+        if logger.isEnabledFor(logging.INFO):
+            ids = results.get('ids')
+            logger.info("Query returned %d results", len(ids[0]) if ids else 0)
         return results
     
     def get(
@@ -191,7 +490,7 @@ class VectorDBManager:
             documents=documents
         )
         
-        logger.info(f"Updated {len(ids)} documents in vector database")
+        logger.info("Updated %d documents in vector database", len(ids))
     
     def delete(
         self,
@@ -226,25 +525,39 @@ class VectorDBManager:
     
     def clear_collection(self) -> None:
         """Clear all documents from the collection."""
-        # Delete and recreate collection
-        self.client.delete_collection(name=self.collection_name)
-        self.collection = self.client.create_collection(
-            name=self.collection_name,
-            metadata={"description": "Document embeddings for RAG system"}
-        )
+        # Discard documents that were buffered but not written yet
+        with self._buf_lock:
+            self._buf_docs.clear()
+            self._buf_ids.clear()
+            self._buf_emb.clear()
+            self._buf_meta.clear()
+        
+        # Delete rows in place (page by page) instead of dropping and
+        # recreating the collection, which rebuilds its index from scratch
+        while True:
+            ids = self.collection.get(limit=CLEAR_PAGE_SIZE, include=[])['ids']
+            if not ids:
+                break
+            self.collection.delete(ids=ids)
         
-        logger.info(f"Cleared collection '{self.collection_name}'")
+        logger.info("Cleared collection '%s'", self.collection_name)
     
     def reset_database(self) -> None:
-        """Reset the entire vector database."""
-        self.client.reset()
-        self.collection = self._get_or_create_collection()
+        """
+        Reset the vector database by removing all documents from the collection.
+        
+        Documents are deleted in place (see clear_collection) rather than with
+        client.reset(), which wipes every collection on disk and forces the
+        persisted index to be rebuilt from scratch.
+        """
+        self.clear_collection()
         
         logger.info("Reset vector database")
 
 
 # Singleton instance
 _vector_db_manager: Optional[VectorDBManager] = None
+_vector_db_manager_lock = threading.Lock()
 
 
 def get_vector_db_manager(**kwargs) -> VectorDBManager:
@@ -256,5 +569,7 @@ def get_vector_db_manager(**kwargs) -> VectorDBManager:
     """
     global _vector_db_manager
     if _vector_db_manager is None:
-        _vector_db_manager = VectorDBManager(**kwargs)
+        with _vector_db_manager_lock:
+            if _vector_db_manager is None:
+                _vector_db_manager = VectorDBManager(**kwargs)
     return _vector_db_manager
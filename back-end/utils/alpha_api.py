@@ -315,7 +315,7 @@ def get_chat_completion(messages: List[Dict[str, str]], model: Optional[str] = N
         >>> messages = [{"role": "user", "content": "Hello!"}]
         >>> response = get_chat_completion(messages)
     """
-    client = AlphaAPIClient()
+    client = get_alpha_api_client()
     return client.chat_completion(messages, model, **kwargs)
 
 
@@ -338,7 +338,7 @@ def get_embeddings(input_data: Union[str, List[str]], model: Optional[str] = Non
         >>> # Or with multiple texts
         >>> response = get_embeddings(["text1", "text2"])
     """
-    client = AlphaAPIClient()
+    client = get_alpha_api_client()
     return client.embeddings(input_data, model, **kwargs)
 
 